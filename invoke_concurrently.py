@@ -1,4 +1,3 @@
-import boto3
 import concurrent.futures
 import time
 import statistics
@@ -9,11 +8,23 @@ import re
 import pytz
 from datetime import datetime
 from botocore.exceptions import ClientError
+from payload_replay import replay_payloads, summarize_by_payload_size
+from soak import soak_in_parallel
+from transport import create_client, prewarm_connections, print_pool_stats
 
 # Constants
 wait_time_before_query = 180
 
+def release_response(response):
+    # Invoke returns a streaming body; botocore keeps the connection checked out of the pool until it is drained
+    if response is not None:
+        try:
+            response['Payload'].read()
+        finally:
+            response['Payload'].close()
+
 def invoke_lambda(lambda_client, function_arn, i):
+    response = None
     try:
         response = lambda_client.invoke(
             FunctionName=function_arn,
@@ -31,11 +42,44 @@ def invoke_lambda(lambda_client, function_arn, i):
     except Exception as e:
         print(f"[ERROR] Error invoking Lambda {i}: {e}")
         return None, None
+    finally:
+        release_response(response)
+
+def invoke_lambda_timed(lambda_client, function_arn, payload, i, scheduled_at=None):
+    # Replays pass the time.perf_counter() value the payload was due at, so waiting for a free worker counts as latency
+    response = None
+    try:
+        invoke_start = time.perf_counter() if scheduled_at is None else scheduled_at
+        response = lambda_client.invoke(
+            FunctionName=function_arn,
+            InvocationType='RequestResponse',
+            Payload=payload,
+            LogType='Tail'
+        )
+        # The response body is part of the round trip, so it is read before the clock stops
+        response['Payload'].read()
+        latency_ms = (time.perf_counter() - invoke_start) * 1000
+
+        log_result = base64.b64decode(response['LogResult']).decode('utf-8')
+
+        if response['StatusCode'] == 200:
+            print(f"[DEBUG] Invocation {i}: StatusCode=200, Payload={len(payload)} bytes, Latency={latency_ms:.2f} ms")
+
+        return response['StatusCode'], latency_ms, extract_billed_duration(log_result), extract_max_memory_used(log_result)
+    except Exception as e:
+        print(f"[ERROR] Error invoking Lambda {i}: {e}")
+        return None, None, None, None
+    finally:
+        release_response(response)
 
 def extract_billed_duration(log):
     match = re.search(r'Billed Duration: (\d+) ms', log)
     return int(match.group(1)) if match else None
 
+def extract_max_memory_used(log):
+    match = re.search(r'Max Memory Used: (\d+) MB', log)
+    return int(match.group(1)) if match else None
+
 def invoke_in_parallel(lambda_client, function_arn, concurrent_users, duration):
     start_time = time.time()
     total_requests = 0
@@ -56,6 +100,28 @@ def invoke_in_parallel(lambda_client, function_arn, concurrent_users, duration):
     print(f"[INFO] Total requests sent: {total_requests}")
     return total_requests, start_time, end_time
 
+def replay_in_parallel(lambda_client, function_arn, concurrent_users, duration, payload_file, replay_speed, payload_report_file=None):
+    total_requests, start_time, end_time, bucket_stats = replay_payloads(
+        lambda payload, i, scheduled_at: invoke_lambda_timed(lambda_client, function_arn, payload, i, scheduled_at),
+        payload_file, concurrent_users, duration=duration, speed=replay_speed
+    )
+
+    df_payload_sizes = pd.DataFrame(summarize_by_payload_size(bucket_stats))
+    print("\nClient-side Latency by Payload Size:")
+    print(df_payload_sizes.to_string(index=False) if not df_payload_sizes.empty else "No payloads were replayed.")
+
+    if payload_report_file and not df_payload_sizes.empty:
+        df_payload_sizes.to_csv(payload_report_file, index=False)
+        print(f"Payload size report has been saved to {payload_report_file}.")
+
+    return total_requests, start_time, end_time
+
+def soak_test(lambda_client, function_arn, concurrent_users, duration, window_seconds, soak_output_file):
+    return soak_in_parallel(
+        lambda i: invoke_lambda_timed(lambda_client, function_arn, b'{}', i),
+        concurrent_users, duration, window_seconds, soak_output_file
+    )
+
 def calculate_statistics(durations):
     if not durations:
         # Return zeros or None if you have no data to avoid errors during calculation
@@ -78,7 +144,7 @@ def calculate_statistics(durations):
 
 
 def query_cloudwatch_logs(log_group_name, start_time, end_time):
-    client = boto3.client('logs')
+    client, _ = create_client('logs')
     query_string = """
     fields @timestamp, @requestId, @billedDuration, @duration, @memorySize
     | filter @type = "REPORT"
@@ -153,12 +219,25 @@ def convert_to_ist(utc_timestamp):
     ist_time = utc_time.astimezone(pytz.timezone('Asia/Kolkata'))
     return ist_time
 
-def main(function_arn, concurrent_users, duration, log_group_name, output_file):
-    lambda_client = boto3.client('lambda')
+def main(function_arn, concurrent_users, duration, log_group_name, output_file, payload_file=None, replay_speed=1.0, payload_report_file=None,
+         soak_output_file=None, window_seconds=60):
+    # Retries would be folded into the measured latency, so failed invocations are reported instead
+    lambda_client, pool_stats = create_client('lambda', concurrency=concurrent_users, max_attempts=1)
+    prewarm_connections(lambda: lambda_client.get_function(FunctionName=function_arn), concurrent_users, pool_stats)
     
-    total_requests, start_time_utc, end_time_utc = invoke_in_parallel(
-        lambda_client, function_arn, concurrent_users, duration
-    )
+    if soak_output_file:
+        total_requests, start_time_utc, end_time_utc = soak_test(
+            lambda_client, function_arn, concurrent_users, duration, window_seconds, soak_output_file
+        )
+    elif payload_file:
+        total_requests, start_time_utc, end_time_utc = replay_in_parallel(
+            lambda_client, function_arn, concurrent_users, duration, payload_file, replay_speed, payload_report_file
+        )
+    else:
+        total_requests, start_time_utc, end_time_utc = invoke_in_parallel(
+            lambda_client, function_arn, concurrent_users, duration
+        )
+    print_pool_stats(pool_stats)
     print(f"[INFO] Waiting for {wait_time_before_query} seconds before querying CloudWatch Logs...")
     time.sleep(wait_time_before_query)
     print(f"[INFO] Querying CloudWatch Logs completed.")
@@ -217,12 +296,23 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Invoke AWS Lambda function with concurrency options.')
     parser.add_argument('--function_arn', type=str, required=True, help='ARN of the Lambda function to invoke')
     parser.add_argument('--concurrent_users', type=int, required=True, help='Number of concurrent users')
-    parser.add_argument('--duration', type=int, required=True, help='Duration to run the invocations (in seconds)')
+    parser.add_argument('--duration', type=int, required=True, help='Duration to run the invocations (in seconds); caps the replay when --payload_file is set')
     parser.add_argument('--output_file', type=str, help='Output CSV file name to save results')
+    parser.add_argument('--payload_file', type=str, help='JSONL file of payloads to replay instead of the fixed empty payload')
+    parser.add_argument('--replay_speed', type=float, default=1.0, help='Speed multiplier for recorded payload timestamps (0 replays back-to-back)')
+    parser.add_argument('--payload_report_file', type=str, help='Output CSV file name to save latency grouped by payload size')
+    parser.add_argument('--soak_output', type=str, help='Run in soak mode, appending rolling-window statistics to this JSONL file')
+    parser.add_argument('--window_seconds', type=int, default=60, help='Length of each soak mode window (in seconds)')
 
     args = parser.parse_args()
+
+    if args.soak_output and args.payload_file:
+        print("Error: Soak mode and payload replay cannot be used together.")
+        exit(1)
+
     function_name = extract_function_name_from_arn(args.function_arn)
     log_group_name = f"/aws/lambda/{function_name}"
 
 
-    main(args.function_arn, args.concurrent_users, args.duration, log_group_name, args.output_file)
\ No newline at end of file
+    main(args.function_arn, args.concurrent_users, args.duration, log_group_name, args.output_file,
+         args.payload_file, args.replay_speed, args.payload_report_file, args.soak_output, args.window_seconds)
\ No newline at end of file
@@ -1,4 +1,3 @@
-import boto3
 import os
 import time
 import json
@@ -7,6 +6,7 @@ import pytz
 from datetime import datetime
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from botocore.exceptions import ClientError
+from transport import create_client, print_pool_stats
 
 LAMBDA_FUNCTION_NAMES = [
    # Add your Lambda function names here
@@ -16,8 +16,9 @@ MAX_INVOCATIONS = 100
 SLEEP_TIME_FOR_INVOCATION = 1
 WAIT_TIME_BETWEEN_PHASES = 300
 
-lambda_client = boto3.client('lambda', region_name=REGION)
-logs_client = boto3.client('logs', region_name=REGION)
+# Each function is benchmarked serially on its own thread, so the pool only needs one connection per function
+lambda_client, lambda_pool_stats = create_client('lambda', concurrency=len(LAMBDA_FUNCTION_NAMES), region_name=REGION)
+logs_client, _ = create_client('logs', concurrency=len(LAMBDA_FUNCTION_NAMES), region_name=REGION)
 
 test_function = {}
 
@@ -213,3 +214,4 @@ if __name__ == "__main__":
     print("Starting parallel invocation of Lambda functions...")
     run_parallel_invocations()
     print("All Lambda functions have been invoked successfully.")
+    print_pool_stats(lambda_pool_stats)
@@ -1,14 +1,18 @@
 import argparse
-import boto3
+import base64
 import requests
 import os
 import time
 import json
+import re
 import pandas as pd
 import pytz
-from datetime import datetime
+from datetime import datetime, timezone
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from botocore.exceptions import ClientError
+from botocore.exceptions import ClientError, WaiterError
+from transport import create_client, print_pool_stats
+from sequential_stats import evaluate_stopping
+from report import RUNS_DIR_NAME, build_report
 
 # Example: Lambda function names mapped to a list of layer ARNs
 LAMBDA_FUNCTIONS_WITH_LAYERS = {
@@ -21,6 +25,27 @@ REGION = 'us-east-1'
 MAX_INVOCATIONS = 100
 SLEEP_TIME_FOR_INVOCATION = 1
 WAIT_TIME_BETWEEN_PHASES = 600
+PROVISIONED_CONCURRENCY = 1
+PROVISIONED_CONCURRENCY_POLL_INTERVAL = 10
+PROVISIONED_CONCURRENCY_TIMEOUT = 900
+# Every SnapStart sample publishes its own version so that each invocation restores a fresh environment
+SNAPSTART_SAMPLES = 20
+MIN_RESTORE_SAMPLES = 10
+# Cold start latency is only compared from invocations that logged an Init Duration
+MIN_INIT_SAMPLES = 10
+# Adaptive mode checks the stopping rule every ADAPTIVE_BATCH_SIZE invocations once ADAPTIVE_MIN_INVOCATIONS are in
+ADAPTIVE_MIN_INVOCATIONS = 20
+ADAPTIVE_BATCH_SIZE = 10
+# Number of planned looks; the significance check is corrected for all of them
+ADAPTIVE_LOOKS = len(range(ADAPTIVE_MIN_INVOCATIONS, MAX_INVOCATIONS + 1, ADAPTIVE_BATCH_SIZE))
+
+REPORT_FIELDS = {
+    'durationMs': r'\tDuration: ([\d.]+) ms',
+    'billedDurationMs': r'Billed Duration: (\d+) ms',
+    'initDurationMs': r'Init Duration: ([\d.]+) ms',
+    'restoreDurationMs': r'Restore Duration: ([\d.]+) ms',
+    'maxMemoryUsedMb': r'Max Memory Used: (\d+) MB',
+}
 
 def get_layer_arn_for_runtime(runtime):
     url = f'https://{REGION}.layers.newrelic-external.com/get-layers'
@@ -53,8 +78,9 @@ def update_lambda_layer(function_name, layers_arn_list):
     print(f"Layers for {function_name} updated to {layers_arn_list}.")
     time.sleep(5)
 
-lambda_client = boto3.client('lambda', region_name=REGION)
-logs_client = boto3.client('logs', region_name=REGION)
+# Each function is benchmarked serially on its own thread, so the pool only needs one connection per function
+lambda_client, lambda_pool_stats = create_client('lambda', concurrency=len(LAMBDA_FUNCTIONS_WITH_LAYERS), region_name=REGION)
+logs_client, _ = create_client('logs', concurrency=len(LAMBDA_FUNCTIONS_WITH_LAYERS), region_name=REGION)
 
 test_function = {}
 
@@ -63,15 +89,127 @@ def convert_to_ist(utc_timestamp):
     ist_time = utc_time.astimezone(pytz.timezone('Asia/Kolkata'))
     return ist_time
 
+def parse_report_line(log):
+    report = {}
+    for field, pattern in REPORT_FIELDS.items():
+        match = re.search(pattern, log)
+        report[field] = float(match.group(1)) if match else None
+    return report
+
 def invoke_lambda(function_name, counter):
     payload = json.dumps({'counter': counter})
+    invoke_start = time.perf_counter()
     response = lambda_client.invoke(
         FunctionName=function_name,
         InvocationType='RequestResponse',
-        Payload=payload
+        Payload=payload,
+        LogType='Tail'
     )
+    # Draining the streaming body returns the connection to the pool
+    try:
+        response['Payload'].read()
+    finally:
+        response['Payload'].close()
+    latency_ms = (time.perf_counter() - invoke_start) * 1000
     print(f"Lambda {function_name} invoked with counter {counter}")
-    return response['Payload'].read()
+    report = parse_report_line(base64.b64decode(response.get('LogResult', '')).decode('utf-8'))
+    report['latencyMs'] = latency_ms
+    report['counter'] = counter
+    report['timestamp'] = time.time()
+    return report
+
+def run_invocations(function_name, cold_start, metric=None, adaptive=None, baseline_values=None):
+    # Invokes up to MAX_INVOCATIONS times; in adaptive mode stops early once the bootstrap interval for the
+    # metric (or for its difference from the baseline layer) meets the requested precision or significance
+    reports = []
+    stopping = None
+    counter = 0
+    while counter < MAX_INVOCATIONS:
+        reports.append(invoke_lambda(function_name, counter))
+        if cold_start:
+            update_lambda_env(function_name, counter)
+        counter += 1
+
+        if adaptive and counter >= ADAPTIVE_MIN_INVOCATIONS and counter % ADAPTIVE_BATCH_SIZE == 0:
+            values = [report[metric] for report in reports if report[metric] is not None]
+            if len(values) >= 2:
+                stopping = evaluate_stopping(
+                    values, adaptive['percentile'], adaptive['precision_ms'], adaptive['confidence'],
+                    baseline_values, adaptive['stop_on_significance'], ADAPTIVE_LOOKS
+                )
+                print(f"{function_name} after {counter} invocations: p{adaptive['percentile']} {metric} "
+                      f"{'difference ' if baseline_values is not None else ''}{stopping['estimate']:.2f} ms "
+                      f"[{stopping['lower']:.2f}, {stopping['upper']:.2f}]")
+                if stopping['stop_reason']:
+                    print(f"Stopping {function_name} early on {stopping['stop_reason']} after {counter} invocations")
+                    break
+        time.sleep(SLEEP_TIME_FOR_INVOCATION)
+    return reports, stopping
+
+def publish_function_version(function_name, description):
+    lambda_client.get_waiter('function_updated_v2').wait(FunctionName=function_name)
+    version = lambda_client.publish_version(FunctionName=function_name, Description=description)['Version']
+    # For SnapStart the version stays Pending until the snapshot has been taken
+    lambda_client.get_waiter('published_version_active').wait(FunctionName=function_name, Qualifier=version)
+    print(f"Published version {version} of {function_name}")
+    return version
+
+def delete_function_version(function_name, version):
+    try:
+        lambda_client.delete_function(FunctionName=function_name, Qualifier=version)
+        print(f"Deleted version {version} of {function_name}")
+    except ClientError as e:
+        print(f"Error deleting version {version} of {function_name}: {e}")
+
+def configure_provisioned_concurrency(function_name, version):
+    lambda_client.put_provisioned_concurrency_config(
+        FunctionName=function_name,
+        Qualifier=version,
+        ProvisionedConcurrentExecutions=PROVISIONED_CONCURRENCY
+    )
+    deadline = time.time() + PROVISIONED_CONCURRENCY_TIMEOUT
+    while time.time() < deadline:
+        config = lambda_client.get_provisioned_concurrency_config(FunctionName=function_name, Qualifier=version)
+        if config['Status'] == 'READY':
+            print(f"Provisioned concurrency of {PROVISIONED_CONCURRENCY} ready for {function_name}:{version}")
+            return True
+        if config['Status'] == 'FAILED':
+            print(f"Provisioned concurrency failed for {function_name}:{version}: {config.get('StatusReason')}")
+            return False
+        time.sleep(PROVISIONED_CONCURRENCY_POLL_INTERVAL)
+    print(f"Provisioned concurrency for {function_name}:{version} not ready after {PROVISIONED_CONCURRENCY_TIMEOUT} seconds")
+    return False
+
+def get_snapstart_setting(function_name):
+    response = lambda_client.get_function_configuration(FunctionName=function_name)
+    return response.get('SnapStart', {}).get('ApplyOn', 'None')
+
+def update_snapstart(function_name, apply_on):
+    lambda_client.get_waiter('function_updated_v2').wait(FunctionName=function_name)
+    lambda_client.update_function_configuration(
+        FunctionName=function_name,
+        SnapStart={'ApplyOn': apply_on}
+    )
+    lambda_client.get_waiter('function_updated_v2').wait(FunctionName=function_name)
+    print(f"SnapStart for {function_name} set to {apply_on}.")
+
+def run_snapstart_samples(function_name, layer_config):
+    reports = []
+    for counter in range(SNAPSTART_SAMPLES):
+        # A new version has no execution environments yet, so its first invocation restores from the snapshot.
+        # Changing the environment makes Lambda publish a new version instead of returning the previous one.
+        version = None
+        try:
+            update_lambda_env(function_name, counter)
+            version = publish_function_version(function_name, f"snapStart benchmark for layer {layer_config}")
+            reports.append(invoke_lambda(f"{function_name}:{version}", counter))
+        except (ClientError, WaiterError) as e:
+            print(f"Error collecting SnapStart sample {counter} for {function_name}: {e}")
+            break
+        finally:
+            if version:
+                delete_function_version(function_name, version)
+    return reports
 
 def update_lambda_env(function_name, counter):
     response = lambda_client.get_function_configuration(FunctionName=function_name)
@@ -83,7 +221,7 @@ def update_lambda_env(function_name, counter):
     )
     print(f"NR_LAMBDA_COUNT for {function_name} updated to {counter}")
 
-def invoke_lambda_function(function_name, layers_list, path_to_save_csv, enable_cold_start=True, enable_warm_start=True, enable_prod_layer=True):
+def invoke_lambda_function(function_name, layers_list, path_to_save_csv, enable_cold_start=True, enable_warm_start=True, enable_prod_layer=True, enable_provisioned_concurrency=False, enable_snapstart=False, adaptive=None):
     function_configuration = lambda_client.get_function(FunctionName=function_name)
     runtime = function_configuration['Configuration']['Runtime']
     
@@ -98,22 +236,26 @@ def invoke_lambda_function(function_name, layers_list, path_to_save_csv, enable_
         print(f"Production layer testing disabled for {function_name}")
 
     test_function[function_name] = {'start_time': None, 'end_time': None, 'query_results': []}
+    phase_results = {}
+    # In adaptive mode the first layer in the list is the baseline the others are compared against
+    baseline_values = {}
     
     # Test each layer configuration
     for layer_config in layers_list:
         update_lambda_layer(function_name, [layer_config])
+        phase_results[layer_config] = {}
+        is_baseline = layer_config == layers_list[0]
         
         # Measure cold starts (only if enabled)
         if enable_cold_start:
             print(f"Starting cold start testing for {function_name} with layer {layer_config}")
-            counter = 0
             test_function[function_name]['start_time'] = time.time()
-            while counter < MAX_INVOCATIONS:
-                invoke_lambda(function_name, counter)
-                update_lambda_env(function_name, counter)
-                counter += 1
-                time.sleep(SLEEP_TIME_FOR_INVOCATION)
+            reports, stopping = run_invocations(
+                function_name, True, 'initDurationMs', adaptive, None if is_baseline else baseline_values.get('coldStart') or None
+            )
             test_function[function_name]['end_time'] = time.time()
+            record_phase_samples(function_name, layer_config, 'coldStart', 'initDurationMs', reports, stopping, is_baseline, baseline_values, adaptive, path_to_save_csv)
+            phase_results[layer_config]['coldStart'] = reports
             print(f"Cold start phase for {function_name} with layer {layer_config} completed.")
             time.sleep(WAIT_TIME_BETWEEN_PHASES)
 
@@ -138,13 +280,12 @@ def invoke_lambda_function(function_name, layers_list, path_to_save_csv, enable_
         # Measure warm starts (only if enabled)
         if enable_warm_start:
             print(f"Starting warm start testing for {function_name} with layer {layer_config}")
-            counter = 0
             test_function[function_name]['start_time'] = time.time()
-            while counter < MAX_INVOCATIONS:
-                invoke_lambda(function_name, counter)
-                counter += 1
-                time.sleep(SLEEP_TIME_FOR_INVOCATION)
+            reports, stopping = run_invocations(
+                function_name, False, 'billedDurationMs', adaptive, None if is_baseline else baseline_values.get('warmStart') or None
+            )
             test_function[function_name]['end_time'] = time.time()
+            record_phase_samples(function_name, layer_config, 'warmStart', 'billedDurationMs', reports, stopping, is_baseline, baseline_values, adaptive, path_to_save_csv)
             print(f"Warm start phase for {function_name} with layer {layer_config} completed.")
             time.sleep(WAIT_TIME_BETWEEN_PHASES)
 
@@ -166,13 +307,198 @@ def invoke_lambda_function(function_name, layers_list, path_to_save_csv, enable_
         else:
             print(f"Warm start testing disabled for {function_name}")
 
-def query_cloudwatch_logs(function_name, start_time, end_time, cold_start):
+        # Measure published versions with provisioned concurrency and SnapStart (only if enabled)
+        if enable_provisioned_concurrency:
+            phase_results[layer_config]['provisionedConcurrency'] = run_published_version_phase(
+                function_name, layer_config, 'provisionedConcurrency', path_to_save_csv
+            )
+        if enable_snapstart:
+            phase_results[layer_config]['snapStart'] = run_published_version_phase(
+                function_name, layer_config, 'snapStart', path_to_save_csv
+            )
+
+    if enable_provisioned_concurrency or enable_snapstart:
+        save_to_csv(
+            os.path.join(path_to_save_csv, f'initComparison_{function_name}.csv'),
+            build_init_comparison(function_name, phase_results)
+        )
+
+def record_phase_samples(function_name, layer_config, phase_name, metric, reports, stopping, is_baseline, baseline_values, adaptive, path_to_save_csv):
+    save_to_csv(
+        os.path.join(path_to_save_csv, 'invocations', f'{phase_name}_{function_name}_{layer_config.split(":")[-1]}.csv'),
+        [dict(report, FunctionName=function_name, Layer=layer_config) for report in reports]
+    )
+    if not adaptive:
+        return
+
+    values = [report[metric] for report in reports if report[metric] is not None]
+    if is_baseline:
+        baseline_values[phase_name] = values
+    if stopping is None and len(values) >= 2:
+        stopping = evaluate_stopping(
+            values, adaptive['percentile'], adaptive['precision_ms'], adaptive['confidence'],
+            None if is_baseline else baseline_values.get(phase_name) or None, adaptive['stop_on_significance'], ADAPTIVE_LOOKS
+        )
+
+    save_to_csv(
+        os.path.join(path_to_save_csv, f'adaptiveComparison_{function_name}.csv'),
+        [{
+            'FunctionName': function_name,
+            'Layer': layer_config,
+            'Phase': phase_name,
+            'Metric': f"p{adaptive['percentile']} {metric}",
+            'Baseline': is_baseline,
+            'Invocations': len(reports),
+            'Samples': len(values),
+            'Estimate (ms)': stopping['estimate'] if stopping else None,
+            'CI Lower (ms)': stopping['lower'] if stopping else None,
+            'CI Upper (ms)': stopping['upper'] if stopping else None,
+            'Adjusted Confidence': stopping['decision_confidence'] if stopping else None,
+            'Adjusted CI Lower (ms)': stopping['decision_lower'] if stopping else None,
+            'Adjusted CI Upper (ms)': stopping['decision_upper'] if stopping else None,
+            'Stop Reason': (stopping['stop_reason'] if stopping else None) or 'max invocations',
+        }]
+    )
+
+def run_published_version_phase(function_name, layer_config, phase_name, path_to_save_csv):
+    # Returns the per-invocation reports of the phase, or an empty list if it could not run
+    print(f"Starting {phase_name} testing for {function_name} with layer {layer_config}")
+    version = None
+    original_snapstart = None
+    try:
+        test_function[function_name]['start_time'] = time.time()
+        if phase_name == 'snapStart':
+            original_snapstart = get_snapstart_setting(function_name)
+            update_snapstart(function_name, 'PublishedVersions')
+            reports = run_snapstart_samples(function_name, layer_config)
+        else:
+            version = publish_function_version(function_name, f"{phase_name} benchmark for layer {layer_config}")
+            if not configure_provisioned_concurrency(function_name, version):
+                return []
+            reports, _ = run_invocations(f"{function_name}:{version}", False)
+        test_function[function_name]['end_time'] = time.time()
+        save_to_csv(
+            os.path.join(path_to_save_csv, 'invocations', f'{phase_name}_{function_name}_{layer_config.split(":")[-1]}.csv'),
+            [dict(report, FunctionName=function_name, Layer=layer_config) for report in reports]
+        )
+        print(f"{phase_name} phase for {function_name} with layer {layer_config} completed.")
+    except (ClientError, WaiterError) as e:
+        print(f"Error during {phase_name} phase for {function_name} with layer {layer_config}: {e}")
+        return []
+    finally:
+        if version:
+            delete_function_version(function_name, version)
+        if original_snapstart is not None:
+            try:
+                update_snapstart(function_name, original_snapstart)
+            except (ClientError, WaiterError) as e:
+                print(f"Error restoring SnapStart setting {original_snapstart} for {function_name}: {e}")
+
+    time.sleep(WAIT_TIME_BETWEEN_PHASES)
+
+    start_time_ist = convert_to_ist(test_function[function_name]['start_time'])
+    end_time_ist = convert_to_ist(test_function[function_name]['end_time'])
+
+    print(f"{phase_name} for {function_name} with layer {layer_config}")
+    print(f"Invocation period in IST:")
+    print(f"Start time (IST): {start_time_ist.strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"End time (IST): {end_time_ist.strftime('%Y-%m-%d %H:%M:%S')}")
+
+    query_results = query_cloudwatch_logs(
+        function_name, test_function[function_name]['start_time'], test_function[function_name]['end_time'], cold_start=True, include_restore=True
+    )
+    save_to_csv(
+        os.path.join(path_to_save_csv, f'{phase_name}_{function_name}_{layer_config.split(":")[-1]}.csv'),
+        query_results
+    )
+    return reports
+
+def report_percentile(reports, field, pct, min_samples=1):
+    values = [report[field] for report in reports or [] if report.get(field) is not None]
+    if len(values) < min_samples:
+        return None
+    return float(pd.Series(values).quantile(pct / 100))
+
+def difference(value, other):
+    return value - other if value is not None and other is not None else None
+
+def reports_with(function_name, layer_config, reports, field, min_samples, description):
+    # Keeps the reports that logged `field`, warning when there are too few of them to report percentiles
+    matching = [report for report in reports or [] if report.get(field) is not None]
+    if reports and len(matching) < min_samples:
+        print(f"Only {len(matching)} {description} recorded for {function_name} with layer {layer_config}, "
+              f"need {min_samples} to report percentiles")
+    return matching
+
+def build_init_comparison(function_name, phase_results):
+    # Compares client-side p50 latency, which includes init and restore time, for every phase that returned data.
+    # Cold starts and SnapStart only count invocations that actually logged an init or a restore.
+    # The first layer is the baseline, so the overhead columns show how much of each layer's extra cost remains.
+    rows = []
+    baseline = None
+    for layer_config, results in phase_results.items():
+        cold_reports = reports_with(function_name, layer_config, results.get('coldStart'), 'initDurationMs', MIN_INIT_SAMPLES, 'cold starts')
+        cold_latency = report_percentile(cold_reports, 'latencyMs', 50, MIN_INIT_SAMPLES)
+        provisioned_latency = report_percentile(results.get('provisionedConcurrency'), 'latencyMs', 50)
+        snapstart_reports = reports_with(function_name, layer_config, results.get('snapStart'), 'restoreDurationMs', MIN_RESTORE_SAMPLES, 'SnapStart restores')
+        snapstart_latency = report_percentile(snapstart_reports, 'latencyMs', 50, MIN_RESTORE_SAMPLES)
+
+        row = {
+            'FunctionName': function_name,
+            'Layer': layer_config,
+            'Cold Starts': len(cold_reports),
+            'Cold Start p50 Latency (ms)': cold_latency,
+            'Cold Start p50 Init (ms)': report_percentile(cold_reports, 'initDurationMs', 50, MIN_INIT_SAMPLES),
+            'Provisioned Invocations': len(results.get('provisionedConcurrency') or []),
+            'Provisioned p50 Latency (ms)': provisioned_latency,
+            'Provisioned p50 Billed Duration (ms)': report_percentile(results.get('provisionedConcurrency'), 'billedDurationMs', 50),
+            'SnapStart Restores': len(snapstart_reports),
+            'SnapStart p50 Latency (ms)': snapstart_latency,
+            'SnapStart p50 Restore (ms)': report_percentile(snapstart_reports, 'restoreDurationMs', 50, MIN_RESTORE_SAMPLES),
+            'SnapStart p99 Restore (ms)': report_percentile(snapstart_reports, 'restoreDurationMs', 99, MIN_RESTORE_SAMPLES),
+            'Latency Removed by Provisioned Concurrency (ms)': difference(cold_latency, provisioned_latency),
+            'Latency Removed by SnapStart (ms)': difference(cold_latency, snapstart_latency),
+        }
+        if baseline is None:
+            baseline = row
+        row['Cold Start Overhead vs Baseline (ms)'] = difference(cold_latency, baseline['Cold Start p50 Latency (ms)'])
+        row['Provisioned Overhead vs Baseline (ms)'] = difference(provisioned_latency, baseline['Provisioned p50 Latency (ms)'])
+        row['SnapStart Overhead vs Baseline (ms)'] = difference(snapstart_latency, baseline['SnapStart p50 Latency (ms)'])
+        row['Overhead Removed by Provisioned Concurrency (ms)'] = difference(row['Cold Start Overhead vs Baseline (ms)'], row['Provisioned Overhead vs Baseline (ms)'])
+        row['Overhead Removed by SnapStart (ms)'] = difference(row['Cold Start Overhead vs Baseline (ms)'], row['SnapStart Overhead vs Baseline (ms)'])
+        rows.append(row)
+    return rows
+
+def query_cloudwatch_logs(function_name, start_time, end_time, cold_start, include_restore=False):
     start_time_millis = int(start_time * 1000)
     end_time_millis = int(end_time * 1000)
 
     log_group_name = f'/aws/lambda/{function_name}'
 
-    if cold_start:
+    if include_restore:
+        # SnapStart reports "Restore Duration" instead of "Init Duration"; neither filter applies to provisioned versions
+        query_string = """
+        fields @timestamp, @requestId, @initDuration, @billedDuration, @duration, @memorySize
+          | filter @type = "REPORT"
+          | parse @message /Restore Duration: (?<restoreDuration>[0-9.]+) ms/
+          | stats 
+             count(@initDuration) as coldStartCount,
+             pct(@initDuration, 50) as p50Init,
+             pct(@initDuration, 90) as p90Init,
+             pct(@initDuration, 99) as p99Init,
+             count(restoreDuration) as restoreCount,
+             pct(restoreDuration, 50) as p50Restore,
+             pct(restoreDuration, 90) as p90Restore,
+             pct(restoreDuration, 99) as p99Restore,
+             count(@billedDuration) as totalInvocations,
+             avg(@billedDuration) as avgBilledDuration,
+             min(@billedDuration) as minBilledDuration,
+             max(@billedDuration) as maxBilledDuration,
+             percentile(@billedDuration, 50) as p50BilledDuration,
+             percentile(@billedDuration, 95) as p95BilledDuration,
+             percentile(@billedDuration, 99) as p99BilledDuration
+        """
+    elif cold_start:
         query_string = """
         fields @timestamp, @requestId, @initDuration, @billedDuration, @duration, @memorySize
           | filter @type = "REPORT"
@@ -264,43 +590,17 @@ def save_to_csv(file_path, data):
     except Exception as e:
         print(f"Error saving data to CSV: {e}")
 
-def convert_csv_to_html(directory_path: str):
-    csv_files = [f for f in os.listdir(directory_path) if f.endswith('.csv')]
-
-    html_output_dir = os.path.join(directory_path, 'html_files')
-    os.makedirs(html_output_dir, exist_ok=True)
-
-    for csv_file in csv_files:
-        file_path = os.path.join(directory_path, csv_file)
-        df = pd.read_csv(file_path)
+def run_parallel_invocations(path_to_save_csv, enable_cold_start=True, enable_warm_start=True, enable_prod_layer=True, enable_provisioned_concurrency=False, enable_snapstart=False, adaptive=None):
+    # Each run writes into its own directory, so earlier runs and the report cache in html_files/ are kept
+    run_path = os.path.join(path_to_save_csv, RUNS_DIR_NAME, datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ'))
+    os.makedirs(run_path, exist_ok=True)
+    print(f"Saving results of this run to {run_path}")
 
-        styled_df = df.style \
-            .set_properties(**{'background-color': '#f0f8ff', 'border-color': '#4682b4', 'border-style': 'solid', 'border-width': '1px', 'text-align': 'center'})\
-            .set_table_styles([{'selector': 'th', 'props': [('background-color', '#4682b4'), ('color', 'white'), ('font-weight', 'bold'), ('text-align', 'center')]}])\
-            .highlight_max(subset=[col for col in df.columns if col not in ['FunctionName', 'Runtime', 'MemorySize', 'Timeout']], color='#90ee90')\
-            .highlight_min(subset=[col for col in df.columns if col not in ['FunctionName', 'Runtime', 'MemorySize', 'Timeout']], color='#ffcccb')
-
-        html_file_name = f"{os.path.splitext(csv_file)[0]}.html"
-        html_path = os.path.join(html_output_dir, html_file_name)
-
-        with open(html_path, 'w') as f:
-            f.write('<html><head><style>table {border-collapse: collapse; margin: 20px;} body {font-family: Arial, sans-serif;}</style></head><body>')
-            f.write(f'<h3>Results for {csv_file}</h3>')
-            f.write(styled_df.to_html())
-            f.write('</body></html>')
-
-        print(f"Converted {csv_file} to {html_file_name}")
-
-def run_parallel_invocations(path_to_save_csv, enable_cold_start=True, enable_warm_start=True, enable_prod_layer=True):
-    if os.path.exists(path_to_save_csv):
-        for file in os.listdir(path_to_save_csv):
-            os.remove(os.path.join(path_to_save_csv, file))
-
-    print(f"Testing configuration: Cold Start: {'Enabled' if enable_cold_start else 'Disabled'}, Warm Start: {'Enabled' if enable_warm_start else 'Disabled'}, Production Layer: {'Enabled' if enable_prod_layer else 'Disabled'}")
+    print(f"Testing configuration: Cold Start: {'Enabled' if enable_cold_start else 'Disabled'}, Warm Start: {'Enabled' if enable_warm_start else 'Disabled'}, Production Layer: {'Enabled' if enable_prod_layer else 'Disabled'}, Provisioned Concurrency: {'Enabled' if enable_provisioned_concurrency else 'Disabled'}, SnapStart: {'Enabled' if enable_snapstart else 'Disabled'}, Adaptive: {'Enabled' if adaptive else 'Disabled'}")
 
     with ThreadPoolExecutor() as executor:
         futures = {
-            executor.submit(invoke_lambda_function, fn_name, layers, path_to_save_csv, enable_cold_start, enable_warm_start, enable_prod_layer): fn_name
+            executor.submit(invoke_lambda_function, fn_name, layers, run_path, enable_cold_start, enable_warm_start, enable_prod_layer, enable_provisioned_concurrency, enable_snapstart, adaptive): fn_name
             for fn_name, layers in LAMBDA_FUNCTIONS_WITH_LAYERS.items()
         }
         for future in as_completed(futures):
@@ -313,27 +613,48 @@ def run_parallel_invocations(path_to_save_csv, enable_cold_start=True, enable_wa
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Invoke AWS Lambda and optionally convert CSV to HTML.')
     parser.add_argument('--csv_path', type=str, default='./test-results', help='Directory path to save CSV.')
-    parser.add_argument('--html', action='store_true', help='Convert CSV files to HTML')
+    parser.add_argument('--html', action='store_true', help='Build a consolidated HTML report from the CSV files')
+    parser.add_argument('--html-only', action='store_true', help='Only rebuild the HTML report from existing CSV files, without invoking')
     parser.add_argument('--disable-cold-start', action='store_true', help='Disable cold start testing')
     parser.add_argument('--disable-warm-start', action='store_true', help='Disable warm start testing')
     parser.add_argument('--disable-prod-layer', action='store_true', help='Disable production layer testing (skip fetching layer from API)')
+    parser.add_argument('--enable-provisioned-concurrency', action='store_true', help='Benchmark a published version with provisioned concurrency')
+    parser.add_argument('--enable-snapstart', action='store_true', help='Benchmark a published version with SnapStart enabled')
+    parser.add_argument('--adaptive', action='store_true', help='Stop each phase early once the comparison with the baseline layer is precise enough')
+    parser.add_argument('--percentile', type=int, default=50, help='Percentile compared in adaptive mode')
+    parser.add_argument('--precision-ms', type=float, default=5.0, help='Adaptive mode stops once the confidence interval half-width is below this (in ms)')
+    parser.add_argument('--confidence', type=float, default=0.95, help='Confidence level of the bootstrap intervals in adaptive mode')
+    parser.add_argument('--stop-on-significance', action='store_true', help='In adaptive mode also stop as soon as the difference from the baseline is significant')
     args = parser.parse_args()
     
     PATH_TO_SAVE_CSV = args.csv_path
+
+    if args.html_only:
+        build_report(PATH_TO_SAVE_CSV)
+        exit(0)
+
     enable_cold_start = not args.disable_cold_start
     enable_warm_start = not args.disable_warm_start
     enable_prod_layer = not args.disable_prod_layer
+    enable_provisioned_concurrency = args.enable_provisioned_concurrency
+    enable_snapstart = args.enable_snapstart
+    adaptive = {
+        'percentile': args.percentile,
+        'precision_ms': args.precision_ms,
+        'confidence': args.confidence,
+        'stop_on_significance': args.stop_on_significance,
+    } if args.adaptive else None
     
     # Validate that at least one test type is enabled
-    if not enable_cold_start and not enable_warm_start:
-        print("Error: Both cold start and warm start testing cannot be disabled simultaneously.")
+    if not enable_cold_start and not enable_warm_start and not enable_provisioned_concurrency and not enable_snapstart:
+        print("Error: At least one of cold start, warm start, provisioned concurrency or SnapStart testing must be enabled.")
         exit(1)
     
     print("Starting parallel invocation of Lambda functions with layers...")
-    run_parallel_invocations(PATH_TO_SAVE_CSV, enable_cold_start, enable_warm_start, enable_prod_layer)
+    run_parallel_invocations(PATH_TO_SAVE_CSV, enable_cold_start, enable_warm_start, enable_prod_layer, enable_provisioned_concurrency, enable_snapstart, adaptive)
     print("All Lambda functions have been invoked successfully.")
+    print_pool_stats(lambda_pool_stats)
 
     if args.html:
-        print(f"Converting CSV files in {PATH_TO_SAVE_CSV} to HTML...")
-        convert_csv_to_html(PATH_TO_SAVE_CSV)
-        print("CSV files have been converted to HTML.")
\ No newline at end of file
+        print(f"Building HTML report from CSV files in {PATH_TO_SAVE_CSV}...")
+        build_report(PATH_TO_SAVE_CSV)
\ No newline at end of file
@@ -0,0 +1,243 @@
+import concurrent.futures
+import json
+import mmap
+import os
+import threading
+import time
+from array import array
+from datetime import datetime, timezone
+from soak import histogram_percentile, new_histogram, record_in_histogram
+
+# Payload size buckets (upper bounds in bytes); the last one is the synchronous invoke limit
+PAYLOAD_SIZE_BUCKETS = [256, 1024, 4 * 1024, 16 * 1024, 64 * 1024, 256 * 1024, 1024 * 1024, 6 * 1024 * 1024]
+# Only records made of these keys are unwrapped; anything else is sent as a bare payload
+RECORD_KEYS = {'timestamp', 'payload'}
+# Warn when invocations start this much later than their recorded arrival time
+SCHEDULE_LAG_WARN_MS = 100
+
+
+def format_size(num_bytes):
+    if num_bytes >= 1024 * 1024:
+        return f"{num_bytes // (1024 * 1024)}MB"
+    if num_bytes >= 1024:
+        return f"{num_bytes // 1024}KB"
+    return f"{num_bytes}B"
+
+
+def get_size_bucket(payload_size):
+    lower = 0
+    for upper in PAYLOAD_SIZE_BUCKETS:
+        if payload_size <= upper:
+            return f"{format_size(lower)}-{format_size(upper)}"
+        lower = upper
+    return f">{format_size(lower)}"
+
+
+def parse_timestamp(value):
+    # Accepts epoch seconds (number or numeric string) or ISO 8601; naive ISO times are taken as UTC
+    if value is None:
+        return None
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if not isinstance(value, str):
+        raise ValueError(f"unsupported timestamp {value!r}")
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    if value.endswith(('Z', 'z')):
+        value = value[:-1] + '+00:00'
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def iter_payloads(payload_file):
+    # Streams (timestamp, payload_bytes) pairs from a JSONL file through mmap, one line at a time.
+    # A line is either {"timestamp": ..., "payload": {...}} or the bare payload object itself.
+    with open(payload_file, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            position = 0
+            file_size = len(mm)
+            while position < file_size:
+                end = mm.find(b'\n', position)
+                if end == -1:
+                    end = file_size
+                line = mm[position:end].strip()
+                position = end + 1
+                if not line:
+                    continue
+
+                try:
+                    record = json.loads(line)
+                except ValueError as e:
+                    print(f"[ERROR] Skipping malformed line in {payload_file}: {e}")
+                    continue
+
+                if isinstance(record, dict) and 'payload' in record and set(record) <= RECORD_KEYS:
+                    try:
+                        timestamp = parse_timestamp(record.get('timestamp'))
+                    except ValueError as e:
+                        print(f"[ERROR] Ignoring bad timestamp in {payload_file}: {e}")
+                        timestamp = None
+                    yield timestamp, json.dumps(record['payload'], separators=(',', ':')).encode('utf-8')
+                else:
+                    yield None, line
+
+
+def new_bucket_stats():
+    # Fixed-size histograms instead of raw samples, so memory does not grow with the size of the corpus
+    return {
+        'invocations': 0, 'errors': 0, 'payload_bytes': 0,
+        'latency': new_distribution(), 'billed_duration': new_distribution(), 'schedule_lag': new_distribution(),
+    }
+
+
+def new_distribution():
+    return {'count': 0, 'sum': 0.0, 'max': 0.0, 'histogram': new_histogram()}
+
+
+def record_in_distribution(distribution, value_ms):
+    distribution['count'] += 1
+    distribution['sum'] += value_ms
+    distribution['max'] = max(distribution['max'], value_ms)
+    record_in_histogram(distribution['histogram'], value_ms)
+
+
+def merge_distributions(distributions):
+    merged = new_distribution()
+    for distribution in distributions:
+        merged['count'] += distribution['count']
+        merged['sum'] += distribution['sum']
+        merged['max'] = max(merged['max'], distribution['max'])
+        for index, count in enumerate(distribution['histogram']):
+            merged['histogram'][index] += count
+    return merged
+
+
+def distribution_mean(distribution):
+    return distribution['sum'] / distribution['count'] if distribution['count'] else 0
+
+
+def distribution_percentile(distribution, pct):
+    # Bucket upper bounds can overshoot the largest sample, so they are capped at it
+    return min(histogram_percentile(distribution['histogram'], pct), distribution['max'])
+
+
+def replay_payloads(invoke_fn, payload_file, concurrent_users, duration=None, speed=1.0):
+    # invoke_fn(payload, i, scheduled_at) must return (status_code, latency_ms, billed_duration_ms, ...); extra values
+    # are ignored. scheduled_at is the time.perf_counter() value the payload was due at under the recorded timing, or
+    # None when there is no timing to follow; latency should be measured from it, so time spent waiting for a free
+    # worker counts. speed scales the recorded inter-arrival gaps; a speed of 0 ignores them and replays back-to-back.
+    bucket_stats = {}
+    lock = threading.Lock()
+    in_flight = threading.BoundedSemaphore(concurrent_users * 2)
+
+    def invoke(payload, i, scheduled_at):
+        schedule_lag_ms = (time.perf_counter() - scheduled_at) * 1000 if scheduled_at is not None else None
+        return schedule_lag_ms, invoke_fn(payload, i, scheduled_at)
+
+    def record_result(bucket, future):
+        try:
+            schedule_lag_ms, result = future.result()
+            status_code, latency_ms, billed_duration = result[:3]
+        except Exception as e:
+            print(f"[ERROR] Replay invocation failed: {e}")
+            schedule_lag_ms, status_code, latency_ms, billed_duration = None, None, None, None
+        finally:
+            in_flight.release()
+
+        with lock:
+            stats = bucket_stats.setdefault(bucket, new_bucket_stats())
+            stats['invocations'] += 1
+            if status_code != 200:
+                stats['errors'] += 1
+            if latency_ms is not None:
+                record_in_distribution(stats['latency'], latency_ms)
+            if billed_duration is not None:
+                record_in_distribution(stats['billed_duration'], billed_duration)
+            if schedule_lag_ms is not None:
+                record_in_distribution(stats['schedule_lag'], max(schedule_lag_ms, 0.0))
+
+    start_time = time.time()
+    replay_start = time.perf_counter()
+    first_timestamp = None
+    total_requests = 0
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=concurrent_users) as executor:
+        for timestamp, payload in iter_payloads(payload_file):
+            if duration and time.time() - start_time >= duration:
+                print(f"[INFO] Replay duration of {duration} seconds reached, stopping.")
+                break
+
+            scheduled_at = None
+            if speed and timestamp is not None:
+                if first_timestamp is None:
+                    first_timestamp = timestamp
+                scheduled_at = replay_start + (timestamp - first_timestamp) / speed
+                delay = scheduled_at - time.perf_counter()
+                if duration:
+                    delay = min(delay, start_time + duration - time.time())
+                if delay > 0:
+                    time.sleep(delay)
+                if duration and time.time() - start_time >= duration:
+                    print(f"[INFO] Replay duration of {duration} seconds reached, stopping.")
+                    break
+
+            in_flight.acquire()
+            bucket = get_size_bucket(len(payload))
+            future = executor.submit(invoke, payload, total_requests, scheduled_at)
+            future.add_done_callback(lambda f, bucket=bucket: record_result(bucket, f))
+            total_requests += 1
+
+            with lock:
+                bucket_stats.setdefault(bucket, new_bucket_stats())['payload_bytes'] += len(payload)
+
+    end_time = time.time()
+    print(f"[INFO] Total payloads replayed: {total_requests}")
+
+    schedule_lag = merge_distributions(stats['schedule_lag'] for stats in bucket_stats.values())
+    if schedule_lag['count']:
+        p99_lag = distribution_percentile(schedule_lag, 99)
+        print(f"[INFO] Schedule lag (ms): average={distribution_mean(schedule_lag):.2f}, p99={p99_lag:.2f}, max={schedule_lag['max']:.2f}")
+        if p99_lag > SCHEDULE_LAG_WARN_MS:
+            print(f"[WARN] Invocations started up to {schedule_lag['max']:.0f} ms behind the recorded timing; "
+                  f"add concurrent users or lower --replay_speed to keep up")
+    return total_requests, start_time, end_time, bucket_stats
+
+
+def summarize_row(label, stats):
+    latency, billed, schedule_lag = stats['latency'], stats['billed_duration'], stats['schedule_lag']
+    return {
+        'Payload Size': label,
+        'Invocations': stats['invocations'],
+        'Errors': stats['errors'],
+        'Average Payload Size (bytes)': stats['payload_bytes'] / stats['invocations'] if stats['invocations'] else 0,
+        'Average Latency (ms)': distribution_mean(latency),
+        '50th Percentile Latency (ms)': distribution_percentile(latency, 50),
+        '95th Percentile Latency (ms)': distribution_percentile(latency, 95),
+        '99th Percentile Latency (ms)': distribution_percentile(latency, 99),
+        'Average Billed Duration (ms)': distribution_mean(billed),
+        '99th Percentile Schedule Lag (ms)': distribution_percentile(schedule_lag, 99),
+        'Maximum Schedule Lag (ms)': schedule_lag['max'],
+    }
+
+
+def summarize_by_payload_size(bucket_stats):
+    bucket_order = {get_size_bucket(upper): i for i, upper in enumerate(PAYLOAD_SIZE_BUCKETS)}
+    rows = [
+        summarize_row(bucket, bucket_stats[bucket])
+        for bucket in sorted(bucket_stats, key=lambda b: bucket_order.get(b, len(bucket_order)))
+    ]
+    if rows:
+        total = new_bucket_stats()
+        for stats in bucket_stats.values():
+            for field in ('invocations', 'errors', 'payload_bytes'):
+                total[field] += stats[field]
+        for field in ('latency', 'billed_duration', 'schedule_lag'):
+            total[field] = merge_distributions(stats[field] for stats in bucket_stats.values())
+        rows.append(summarize_row('All', total))
+    return rows
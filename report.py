@@ -0,0 +1,461 @@
+import hashlib
+import html
+import json
+import math
+import os
+import shutil
+import numpy as np
+import pandas as pd
+from soak import HISTOGRAM_BUCKETS, HISTOGRAM_GROWTH
+
+PHASE_ORDER = ['coldStart', 'warmStart', 'provisionedConcurrency', 'snapStart']
+PHASE_TITLES = {
+    'coldStart': 'Cold Start',
+    'warmStart': 'Warm Start',
+    'provisionedConcurrency': 'Provisioned Concurrency',
+    'snapStart': 'SnapStart',
+}
+COMPARISON_PREFIXES = ['initComparison', 'adaptiveComparison']
+METRIC_TITLES = {
+    'initDurationMs': 'Init Duration (ms)',
+    'restoreDurationMs': 'Restore Duration (ms)',
+    'billedDurationMs': 'Billed Duration (ms)',
+}
+REPORT_PERCENTILES = [50, 90, 99]
+
+# measureNew.py writes every run into its own subdirectory of RUNS_DIR_NAME
+RUNS_DIR_NAME = 'runs'
+# Every result file is reduced once to an aggregate cached here; bump CACHE_VERSION when the aggregate format changes
+CACHE_DIR_NAME = '.report_cache'
+MANIFEST_FILE_NAME = 'manifest.json'
+CACHE_VERSION = 2
+
+CHART_WIDTH = 640
+CHART_HEIGHT = 320
+CHART_MARGIN = 50
+# CDFs are drawn from this many quantiles, so chart size does not grow with the number of runs
+CDF_POINTS = 200
+HISTOGRAM_BINS = 30
+SERIES_COLORS = ['#4682b4', '#e4572e', '#29a36a', '#a05195', '#f2a541', '#5c6770', '#17becf', '#8c564b']
+
+PAGE_HEADER = """<html><head><meta charset="utf-8"><style>
+body {font-family: Arial, sans-serif; margin: 20px;}
+table {border-collapse: collapse; margin: 20px 0;}
+th {background-color: #4682b4; color: white; font-weight: bold; text-align: center; cursor: pointer; padding: 4px 8px;}
+td {background-color: #f0f8ff; border: 1px solid #4682b4; text-align: center; padding: 4px 8px;}
+.charts {display: flex; flex-wrap: wrap; gap: 20px;}
+</style></head><body>
+<h2>Lambda Layer Benchmark Report</h2>
+"""
+
+# Click a column header to sort the table by it; numeric columns sort numerically
+PAGE_FOOTER = """<script>
+document.querySelectorAll('table.sortable th').forEach(function (th) {
+    th.addEventListener('click', function () {
+        var table = th.closest('table');
+        var body = table.tBodies[0];
+        var index = Array.prototype.indexOf.call(th.parentNode.children, th);
+        var ascending = th.dataset.order !== 'asc';
+        th.dataset.order = ascending ? 'asc' : 'desc';
+        Array.from(body.rows).sort(function (a, b) {
+            var x = a.cells[index].innerText, y = b.cells[index].innerText;
+            var nx = parseFloat(x), ny = parseFloat(y);
+            var result = (isNaN(nx) || isNaN(ny)) ? x.localeCompare(y) : nx - ny;
+            return ascending ? result : -result;
+        }).forEach(function (row) { body.appendChild(row); });
+    });
+});
+</script></body></html>
+"""
+
+
+def layer_label(layer_arn):
+    # 'arn:aws:lambda:region:account:layer:NRExample:12' -> 'NRExample:12'
+    return ':'.join(str(layer_arn).split(':')[-2:])
+
+
+def parse_result_file_name(file_name):
+    # '{phase}_{function_name}_{layer_version}.csv' or '{comparison}_{function_name}.csv'
+    stem = os.path.splitext(file_name)[0]
+    prefix, _, rest = stem.partition('_')
+    if prefix in COMPARISON_PREFIXES:
+        return prefix, rest
+    if prefix in PHASE_ORDER and '_' in rest:
+        return prefix, rest.rsplit('_', 1)[0]
+    return None, None
+
+
+def result_directories(directory_path):
+    # Results written before runs had their own directory sit directly in directory_path
+    directories = [directory_path]
+    runs_dir = os.path.join(directory_path, RUNS_DIR_NAME)
+    if os.path.isdir(runs_dir):
+        directories.extend(
+            os.path.join(runs_dir, run_name) for run_name in sorted(os.listdir(runs_dir))
+            if os.path.isdir(os.path.join(runs_dir, run_name))
+        )
+    return directories
+
+
+def run_name(file_path):
+    # 'runs/20240101T000000Z/invocations/coldStart_fn_12.csv' -> '20240101T000000Z'; '' for top-level results
+    run_dir = os.path.dirname(file_path)
+    if os.path.basename(run_dir) == 'invocations':
+        run_dir = os.path.dirname(run_dir)
+    if os.path.basename(os.path.dirname(run_dir)) == RUNS_DIR_NAME:
+        return os.path.basename(run_dir)
+    return ''
+
+
+def collect_inputs(directory_path):
+    # Lists (section_key, file_path) for every result file of every run, where section_key is
+    # ('summary', function_name, ''), ('phase', function_name, phase) or ('comparison', function_name, prefix)
+    inputs = []
+    for run_dir in result_directories(directory_path):
+        for file_name in sorted(os.listdir(run_dir)):
+            if not file_name.endswith('.csv'):
+                continue
+            prefix, function_name = parse_result_file_name(file_name)
+            if prefix in PHASE_ORDER:
+                inputs.append((('summary', function_name, ''), os.path.join(run_dir, file_name)))
+            elif prefix in COMPARISON_PREFIXES:
+                inputs.append((('comparison', function_name, prefix), os.path.join(run_dir, file_name)))
+
+        invocations_dir = os.path.join(run_dir, 'invocations')
+        if os.path.isdir(invocations_dir):
+            for file_name in sorted(os.listdir(invocations_dir)):
+                if not file_name.endswith('.csv'):
+                    continue
+                phase, function_name = parse_result_file_name(file_name)
+                if phase in PHASE_ORDER:
+                    inputs.append((('phase', function_name, phase), os.path.join(invocations_dir, file_name)))
+    return inputs
+
+
+def section_order(section_key):
+    kind, function_name, name = section_key
+    kind_order = {'summary': 0, 'phase': 1, 'comparison': 2}
+    name_order = PHASE_ORDER.index(name) if kind == 'phase' else COMPARISON_PREFIXES.index(name) if kind == 'comparison' else 0
+    return function_name, kind_order[kind], name_order
+
+
+def inputs_signature(file_paths):
+    digest = hashlib.sha256()
+    for file_path in sorted(file_paths):
+        stat = os.stat(file_path)
+        digest.update(f"{file_path}:{stat.st_size}:{stat.st_mtime_ns}\n".encode('utf-8'))
+    return digest.hexdigest()
+
+
+def histogram_of(values):
+    # Sparse counts over the log-spaced buckets of soak.py (~2% wide), so histograms of different runs can be merged
+    indices = np.floor(np.log(np.maximum(values, 1)) / math.log(HISTOGRAM_GROWTH)).astype(int) + 1
+    indices = np.minimum(np.where(values <= 1, 0, indices), HISTOGRAM_BUCKETS - 1)
+    buckets, counts = np.unique(indices, return_counts=True)
+    return {'buckets': buckets.tolist(), 'counts': counts.tolist()}
+
+
+def aggregate_table(file_path, section_key):
+    df = pd.read_csv(file_path).drop(columns=['FunctionName'], errors='ignore')
+    if section_key[0] == 'summary':
+        df.insert(0, 'Layer Version', os.path.splitext(os.path.basename(file_path))[0].rsplit('_', 1)[-1])
+        df.insert(0, 'Phase', PHASE_TITLES[parse_result_file_name(os.path.basename(file_path))[0]])
+    elif 'Layer' in df.columns:
+        df['Layer'] = df['Layer'].map(layer_label)
+    df.insert(0, 'Run', run_name(file_path))
+    return {'rows': df.to_dict('records')}
+
+
+def aggregate_invocations(file_path):
+    # Per layer and metric: exact percentiles of this run, for per-run overheads, and a mergeable histogram
+    df = pd.read_csv(file_path)
+    layers = []
+    for layer, group in df.groupby('Layer', sort=False):
+        metrics = {}
+        for metric in METRIC_TITLES:
+            values = group[metric].dropna().to_numpy(dtype=float) if metric in group.columns else []
+            if len(values):
+                metrics[metric] = {
+                    'count': len(values),
+                    'percentiles': np.percentile(values, REPORT_PERCENTILES).tolist(),
+                    'min': float(values.min()),
+                    'max': float(values.max()),
+                    **histogram_of(values),
+                }
+        layers.append({'layer': layer_label(layer), 'first_timestamp': float(group['timestamp'].min()), 'metrics': metrics})
+    return {'run': run_name(file_path), 'layers': layers}
+
+
+def aggregate_input(section_key, file_path):
+    if section_key[0] == 'phase':
+        return aggregate_invocations(file_path)
+    return aggregate_table(file_path, section_key)
+
+
+def merge_histograms(metric_stats):
+    counts = np.zeros(HISTOGRAM_BUCKETS)
+    for stats in metric_stats:
+        np.add.at(counts, stats['buckets'], stats['counts'])
+    return {
+        'counts': counts,
+        'total': counts.sum(),
+        'min': min(stats['min'] for stats in metric_stats),
+        'max': max(stats['max'] for stats in metric_stats),
+    }
+
+
+def histogram_quantiles(histogram, fractions):
+    # Upper bound of the bucket holding each quantile, clipped to the observed range
+    ranks = np.maximum(np.ceil(np.asarray(fractions) * histogram['total']), 1)
+    indices = np.searchsorted(np.cumsum(histogram['counts']), ranks)
+    return np.clip(HISTOGRAM_GROWTH ** indices, histogram['min'], histogram['max'])
+
+
+def render_table(df):
+    return df.to_html(classes='sortable', index=False, na_rep='', float_format=lambda value: f"{value:.2f}", border=0)
+
+
+def render_summary_section(aggregates):
+    df = pd.DataFrame([row for aggregate in aggregates for row in aggregate['rows']])
+    df['Phase'] = pd.Categorical(df['Phase'], [PHASE_TITLES[phase] for phase in PHASE_ORDER], ordered=True)
+    df = df.sort_values(['Phase', 'Layer Version', 'Run'])
+    return f"<h3>Cold vs Warm Summary</h3>\n{render_table(df)}"
+
+
+def render_comparison_section(prefix, aggregates):
+    df = pd.DataFrame([row for aggregate in aggregates for row in aggregate['rows']])
+    title = 'Init Cost with Provisioned Concurrency and SnapStart' if prefix == 'initComparison' else 'Adaptive Comparison'
+    return f"<h3>{title}</h3>\n{render_table(df)}"
+
+
+def chart_frame(title, x_label, x_min, x_max, y_label, y_max):
+    plot_width = CHART_WIDTH - 2 * CHART_MARGIN
+    plot_height = CHART_HEIGHT - 2 * CHART_MARGIN
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{CHART_WIDTH}" height="{CHART_HEIGHT}" font-size="11">',
+        f'<text x="{CHART_WIDTH / 2}" y="20" text-anchor="middle" font-weight="bold">{html.escape(title)}</text>',
+        f'<rect x="{CHART_MARGIN}" y="{CHART_MARGIN}" width="{plot_width}" height="{plot_height}" fill="none" stroke="#999"/>',
+        f'<text x="{CHART_WIDTH / 2}" y="{CHART_HEIGHT - 10}" text-anchor="middle">{html.escape(x_label)}</text>',
+        f'<text x="12" y="{CHART_HEIGHT / 2}" text-anchor="middle" transform="rotate(-90 12 {CHART_HEIGHT / 2})">{html.escape(y_label)}</text>',
+    ]
+    for fraction in np.linspace(0, 1, 5):
+        x = CHART_MARGIN + fraction * plot_width
+        y = CHART_HEIGHT - CHART_MARGIN - fraction * plot_height
+        parts.append(f'<text x="{x:.1f}" y="{CHART_HEIGHT - CHART_MARGIN + 14}" text-anchor="middle">{x_min + fraction * (x_max - x_min):.0f}</text>')
+        parts.append(f'<text x="{CHART_MARGIN - 4}" y="{y + 4:.1f}" text-anchor="end">{fraction * y_max:.2f}</text>')
+    return parts
+
+
+def chart_legend(labels):
+    return [
+        f'<text x="{CHART_WIDTH - CHART_MARGIN - 4}" y="{CHART_MARGIN + 14 * (i + 1)}" text-anchor="end" '
+        f'fill="{SERIES_COLORS[i % len(SERIES_COLORS)]}">{html.escape(label)}</text>'
+        for i, label in enumerate(labels)
+    ]
+
+
+def scale(values, low, high, size):
+    span = (high - low) or 1
+    return (np.asarray(values) - low) / span * size
+
+
+def render_cdf_svg(series, title, x_label):
+    # series maps each label to its values at CDF_POINTS evenly spaced quantiles
+    all_values = np.concatenate(list(series.values()))
+    x_min, x_max = float(all_values.min()), float(all_values.max())
+    plot_width = CHART_WIDTH - 2 * CHART_MARGIN
+    plot_height = CHART_HEIGHT - 2 * CHART_MARGIN
+
+    parts = chart_frame(title, x_label, x_min, x_max, 'Cumulative fraction', 1)
+    for i, quantiles in enumerate(series.values()):
+        fractions = np.linspace(0, 1, len(quantiles))
+        xs = CHART_MARGIN + scale(quantiles, x_min, x_max, plot_width)
+        ys = CHART_HEIGHT - CHART_MARGIN - fractions * plot_height
+        points = ' '.join(f"{x:.1f},{y:.1f}" for x, y in zip(xs, ys))
+        parts.append(f'<polyline points="{points}" fill="none" stroke="{SERIES_COLORS[i % len(SERIES_COLORS)]}" stroke-width="2"/>')
+    parts.extend(chart_legend(series.keys()))
+    parts.append('</svg>')
+    return '\n'.join(parts)
+
+
+def render_histogram_svg(series, title, x_label):
+    # series maps each label to a merged histogram, re-binned here into HISTOGRAM_BINS linear bins
+    edges = np.linspace(min(h['min'] for h in series.values()), max(h['max'] for h in series.values()), HISTOGRAM_BINS + 1)
+    fractions = {}
+    for label, histogram in series.items():
+        buckets = np.flatnonzero(histogram['counts'])
+        values = np.clip(HISTOGRAM_GROWTH ** buckets, histogram['min'], histogram['max'])
+        fractions[label] = np.histogram(values, bins=edges, weights=histogram['counts'][buckets])[0] / histogram['total']
+    y_max = max(float(counts.max()) for counts in fractions.values()) or 1
+    plot_width = CHART_WIDTH - 2 * CHART_MARGIN
+    plot_height = CHART_HEIGHT - 2 * CHART_MARGIN
+    bar_width = plot_width / HISTOGRAM_BINS / len(series)
+
+    parts = chart_frame(title, x_label, float(edges[0]), float(edges[-1]), 'Fraction of invocations', y_max)
+    for i, counts in enumerate(fractions.values()):
+        xs = CHART_MARGIN + scale(edges[:-1], edges[0], edges[-1], plot_width) + i * bar_width
+        heights = counts / y_max * plot_height
+        color = SERIES_COLORS[i % len(SERIES_COLORS)]
+        for x, height in zip(xs, heights):
+            if height > 0:
+                parts.append(f'<rect x="{x:.1f}" y="{CHART_HEIGHT - CHART_MARGIN - height:.1f}" width="{bar_width:.1f}" height="{height:.1f}" fill="{color}"/>')
+    parts.extend(chart_legend(series.keys()))
+    parts.append('</svg>')
+    return '\n'.join(parts)
+
+
+def render_phase_section(phase, aggregates):
+    entries = [dict(entry, run=aggregate['run']) for aggregate in aggregates for entry in aggregate['layers']]
+    runs = {}
+    for entry in entries:
+        runs.setdefault(entry['run'], []).append(entry)
+
+    # Layers are benchmarked in list order, so each run's baseline is the layer whose invocations started first in
+    # that run. Overheads are taken within a run and only then summarized, so runs with different layer lists or
+    # code versions are never compared with each other.
+    run_baselines = {run: min(run_entries, key=lambda entry: entry['first_timestamp']) for run, run_entries in runs.items()}
+    first_seen = {}
+    for entry in entries:
+        first_seen[entry['layer']] = min(first_seen.get(entry['layer'], entry['first_timestamp']), entry['first_timestamp'])
+    layer_order = sorted(first_seen, key=first_seen.get)
+    baseline_counts = {layer: 0 for layer in layer_order}
+    for baseline in run_baselines.values():
+        baseline_counts[baseline['layer']] += 1
+
+    rows = []
+    fragments = []
+    for metric, metric_title in METRIC_TITLES.items():
+        metric_stats = {}
+        overheads = {}
+        for entry in entries:
+            stats = entry['metrics'].get(metric)
+            if stats is None:
+                continue
+            metric_stats.setdefault(entry['layer'], []).append(stats)
+            baseline = run_baselines[entry['run']]
+            baseline_stats = baseline['metrics'].get(metric)
+            if baseline is not entry and baseline_stats is not None:
+                overheads.setdefault(entry['layer'], []).append(np.subtract(stats['percentiles'], baseline_stats['percentiles']))
+        if not metric_stats:
+            continue
+
+        histograms = {layer: merge_histograms(metric_stats[layer]) for layer in layer_order if layer in metric_stats}
+        for layer, histogram in histograms.items():
+            percentiles = histogram_quantiles(histogram, np.array(REPORT_PERCENTILES) / 100)
+            # Runs in which the layer was itself the baseline add nothing but zeros, so they are left out
+            if layer in overheads:
+                median_overheads = np.median(overheads[layer], axis=0)
+            else:
+                median_overheads = np.zeros(len(REPORT_PERCENTILES)) if baseline_counts[layer] else None
+            row = {
+                'Metric': metric_title, 'Layer': layer, 'Runs': len(metric_stats[layer]),
+                'Runs as Baseline': baseline_counts[layer], 'Samples': int(histogram['total']),
+            }
+            for i, pct in enumerate(REPORT_PERCENTILES):
+                row[f'Pooled p{pct} (ms)'] = percentiles[i]
+            for i, pct in enumerate(REPORT_PERCENTILES):
+                row[f'Median p{pct} Overhead vs Run Baseline (ms)'] = median_overheads[i] if median_overheads is not None else None
+            rows.append(row)
+
+        fragments.append(render_cdf_svg(
+            {layer: histogram_quantiles(histogram, np.linspace(0, 1, CDF_POINTS)) for layer, histogram in histograms.items()},
+            f"{metric_title} CDF", metric_title
+        ))
+        fragments.append(render_histogram_svg(histograms, f"{metric_title} Histogram", metric_title))
+
+    baselines = sorted({baseline['layer'] for baseline in run_baselines.values()})
+    baseline_title = baselines[0] if len(baselines) == 1 else 'first layer of each run'
+    title = f"<h3>{PHASE_TITLES[phase]} over {len(runs)} run(s) (baseline: {html.escape(baseline_title)})</h3>"
+    if not rows:
+        return f"{title}\n<p>No REPORT data recorded.</p>"
+    return f"{title}\n{render_table(pd.DataFrame(rows))}\n<div class=\"charts\">\n" + '\n'.join(fragments) + "\n</div>"
+
+
+def render_section(section_key, aggregates):
+    kind, function_name, name = section_key
+    if kind == 'summary':
+        return render_summary_section(aggregates)
+    if kind == 'comparison':
+        return render_comparison_section(name, aggregates)
+    return render_phase_section(name, aggregates)
+
+
+def load_manifest(cache_dir):
+    manifest_path = os.path.join(cache_dir, MANIFEST_FILE_NAME)
+    if os.path.isfile(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        if manifest.get('version') == CACHE_VERSION:
+            return manifest['files']
+    # A cache in an older format is dropped and rebuilt
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    os.makedirs(cache_dir, exist_ok=True)
+    return {}
+
+
+def build_report(directory_path):
+    # Renders one consolidated report. Every result file is parsed once into an aggregate (table rows, or per-run
+    # percentiles and a mergeable histogram per layer) that is cached with a signature of that file, so a new run
+    # only parses its own files and the page is assembled by merging the cached aggregates.
+    html_output_dir = os.path.join(directory_path, 'html_files')
+    cache_dir = os.path.join(html_output_dir, CACHE_DIR_NAME)
+    os.makedirs(cache_dir, exist_ok=True)
+    manifest = load_manifest(cache_dir)
+
+    new_manifest = {}
+    parsed = 0
+    sections = {}
+
+    for section_key, file_path in collect_inputs(directory_path):
+        key = os.path.relpath(file_path, directory_path)
+        signature = inputs_signature([file_path])
+        aggregate_path = os.path.join(cache_dir, f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.json")
+
+        if manifest.get(key) == signature and os.path.isfile(aggregate_path):
+            with open(aggregate_path) as f:
+                aggregate = json.load(f)
+        else:
+            try:
+                aggregate = aggregate_input(section_key, file_path)
+            except Exception as e:
+                print(f"Error reading result file {file_path}: {e}")
+                continue
+            with open(aggregate_path, 'w') as f:
+                json.dump(aggregate, f)
+            parsed += 1
+
+        new_manifest[key] = signature
+        sections.setdefault(section_key, []).append(aggregate)
+
+    for key in set(manifest) - set(new_manifest):
+        stale_path = os.path.join(cache_dir, f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.json")
+        if os.path.isfile(stale_path):
+            os.remove(stale_path)
+
+    report_path = os.path.join(html_output_dir, 'report.html')
+    if new_manifest == manifest and os.path.isfile(report_path):
+        print(f"Report {report_path} is up to date ({len(new_manifest)} result files)")
+        return report_path
+
+    with open(os.path.join(cache_dir, MANIFEST_FILE_NAME), 'w') as f:
+        json.dump({'version': CACHE_VERSION, 'files': new_manifest}, f)
+
+    fragments_by_function = {}
+    for section_key in sorted(sections, key=section_order):
+        try:
+            fragment = render_section(section_key, sections[section_key])
+        except Exception as e:
+            print(f"Error rendering report section {'::'.join(section_key)}: {e}")
+            continue
+        fragments_by_function.setdefault(section_key[1], []).append(fragment)
+
+    with open(report_path, 'w') as f:
+        f.write(PAGE_HEADER)
+        for function_name, fragments in fragments_by_function.items():
+            f.write(f"<h2>{html.escape(function_name)}</h2>\n")
+            f.write('\n'.join(fragments))
+            f.write('\n')
+        f.write(PAGE_FOOTER)
+
+    print(f"Report written to {report_path} ({parsed} of {len(new_manifest)} result files parsed)")
+    return report_path
@@ -0,0 +1,62 @@
+import numpy as np
+
+# Interim looks use intervals as wide as 1 - alpha / looks, so enough resamples are drawn to resolve their tails
+BOOTSTRAP_RESAMPLES = 10000
+BOOTSTRAP_SEED = 42
+
+
+def bootstrap_percentile_resamples(samples, percentile, baseline_samples=None, resamples=BOOTSTRAP_RESAMPLES, seed=BOOTSTRAP_SEED):
+    # Returns (estimate, resampled) for the percentile of `samples`, or for its difference from
+    # `baseline_samples` when given. All resamples are drawn as one index matrix and reduced along axis 1.
+    rng = np.random.default_rng(seed)
+    samples = np.asarray(samples, dtype=float)
+    resampled = np.percentile(samples[rng.integers(0, len(samples), size=(resamples, len(samples)))], percentile, axis=1)
+    estimate = np.percentile(samples, percentile)
+
+    if baseline_samples is not None:
+        baseline_samples = np.asarray(baseline_samples, dtype=float)
+        resampled -= np.percentile(
+            baseline_samples[rng.integers(0, len(baseline_samples), size=(resamples, len(baseline_samples)))], percentile, axis=1
+        )
+        estimate -= np.percentile(baseline_samples, percentile)
+
+    return float(estimate), resampled
+
+
+def percentile_interval(resampled, confidence):
+    alpha = 1 - confidence
+    lower, upper = np.percentile(resampled, [100 * alpha / 2, 100 * (1 - alpha / 2)])
+    return float(lower), float(upper)
+
+
+def bootstrap_percentile_ci(samples, percentile, confidence=0.95, baseline_samples=None, resamples=BOOTSTRAP_RESAMPLES, seed=BOOTSTRAP_SEED):
+    # Returns (estimate, lower, upper) for the percentile of `samples`, or for its difference from `baseline_samples`
+    estimate, resampled = bootstrap_percentile_resamples(samples, percentile, baseline_samples, resamples, seed)
+    return (estimate, *percentile_interval(resampled, confidence))
+
+
+def evaluate_stopping(samples, percentile, precision_ms, confidence=0.95, baseline_samples=None, stop_on_significance=False, looks=1):
+    # Stop once the confidence interval is narrower than +/- precision_ms, or, if requested,
+    # as soon as the difference from the baseline is significant (the interval excludes zero).
+    # The rule is checked at up to `looks` planned looks, so the significance check uses a Bonferroni-adjusted
+    # level of alpha / looks to keep the overall false positive rate within alpha. The reported interval is nominal.
+    estimate, resampled = bootstrap_percentile_resamples(samples, percentile, baseline_samples)
+    lower, upper = percentile_interval(resampled, confidence)
+    decision_confidence = 1 - (1 - confidence) / looks
+    decision_lower, decision_upper = percentile_interval(resampled, decision_confidence)
+
+    stop_reason = None
+    if (upper - lower) / 2 <= precision_ms:
+        stop_reason = 'precision'
+    elif stop_on_significance and baseline_samples is not None and (decision_lower > 0 or decision_upper < 0):
+        stop_reason = 'significance'
+
+    return {
+        'estimate': estimate,
+        'lower': lower,
+        'upper': upper,
+        'decision_confidence': decision_confidence,
+        'decision_lower': decision_lower,
+        'decision_upper': decision_upper,
+        'stop_reason': stop_reason,
+    }
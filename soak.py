@@ -0,0 +1,196 @@
+import concurrent.futures
+import json
+import math
+import time
+from array import array
+from datetime import datetime, timezone
+
+# Latency histogram with log-spaced buckets: ~1% relative error from 1 ms up to 15 min in constant memory
+HISTOGRAM_GROWTH = 1.02
+HISTOGRAM_MAX_MS = 15 * 60 * 1000
+HISTOGRAM_BUCKETS = int(math.log(HISTOGRAM_MAX_MS) / math.log(HISTOGRAM_GROWTH)) + 2
+
+# Trend detection: flag drift once enough windows exist, the fitted slope is significantly positive
+# (t statistic above TREND_MIN_T_STATISTIC) and the fitted growth over the elapsed run exceeds this share of the mean
+TREND_MIN_WINDOWS = 10
+TREND_MIN_T_STATISTIC = 4.0
+TREND_MIN_RELATIVE_GROWTH = 0.10
+
+
+def new_histogram():
+    return array('L', [0]) * HISTOGRAM_BUCKETS
+
+
+def record_in_histogram(histogram, value_ms):
+    index = 0 if value_ms <= 1 else int(math.log(value_ms) / math.log(HISTOGRAM_GROWTH)) + 1
+    histogram[min(index, HISTOGRAM_BUCKETS - 1)] += 1
+
+
+def histogram_percentile(histogram, pct):
+    total = sum(histogram)
+    if not total:
+        return 0
+    rank = math.ceil(total * pct / 100)
+    seen = 0
+    for index, count in enumerate(histogram):
+        seen += count
+        if seen >= rank:
+            # Report the upper bound of the bucket, so percentiles never underestimate
+            return HISTOGRAM_GROWTH ** index
+    return HISTOGRAM_MAX_MS
+
+
+def new_window_stats(window_start):
+    return {
+        'window_start': window_start,
+        'invocations': 0,
+        'errors': 0,
+        'latency_sum': 0.0,
+        'latency_max': 0.0,
+        'latency_histogram': new_histogram(),
+        'billed_sum': 0,
+        'billed_count': 0,
+        'max_memory_used': 0,
+    }
+
+
+def new_trend():
+    return {'n': 0, 'first_x': None, 'last_x': None, 'sum_x': 0.0, 'sum_y': 0.0, 'sum_xy': 0.0, 'sum_xx': 0.0, 'sum_yy': 0.0}
+
+
+def update_trend(trend, x, y):
+    if trend['first_x'] is None:
+        trend['first_x'] = x
+    trend['last_x'] = x
+    trend['n'] += 1
+    trend['sum_x'] += x
+    trend['sum_y'] += y
+    trend['sum_xy'] += x * y
+    trend['sum_xx'] += x * x
+    trend['sum_yy'] += y * y
+
+
+def trend_fit(trend):
+    # Least-squares slope of y over x and its t statistic, from running sums so no window history has to be kept
+    n = trend['n']
+    if n < 3:
+        return 0.0, 0.0
+    sxx = trend['sum_xx'] - trend['sum_x'] ** 2 / n
+    sxy = trend['sum_xy'] - trend['sum_x'] * trend['sum_y'] / n
+    syy = trend['sum_yy'] - trend['sum_y'] ** 2 / n
+    if sxx <= 0:
+        return 0.0, 0.0
+    slope = sxy / sxx
+    residual_variance = max(syy - slope * sxy, 0.0) / (n - 2)
+    if residual_variance == 0:
+        return slope, math.inf if slope > 0 else 0.0
+    return slope, slope / math.sqrt(residual_variance / sxx)
+
+
+def relative_growth(trend, slope):
+    # Fitted growth over the elapsed run as a share of the mean value
+    mean = trend['sum_y'] / trend['n'] if trend['n'] else 0
+    if mean <= 0:
+        return 0.0
+    return slope * (trend['last_x'] - trend['first_x']) / mean
+
+
+def is_drifting(trend, slope, t_statistic):
+    return (
+        trend['n'] >= TREND_MIN_WINDOWS
+        and t_statistic > TREND_MIN_T_STATISTIC
+        and relative_growth(trend, slope) > TREND_MIN_RELATIVE_GROWTH
+    )
+
+
+def record_invocation(window, status_code, latency_ms, billed_duration, max_memory_used):
+    window['invocations'] += 1
+    if status_code != 200:
+        window['errors'] += 1
+    if latency_ms is not None:
+        window['latency_sum'] += latency_ms
+        window['latency_max'] = max(window['latency_max'], latency_ms)
+        record_in_histogram(window['latency_histogram'], latency_ms)
+    if billed_duration is not None:
+        window['billed_sum'] += billed_duration
+        window['billed_count'] += 1
+    if max_memory_used is not None:
+        window['max_memory_used'] = max(window['max_memory_used'], max_memory_used)
+
+
+def close_window(window, window_end, run_start, trends):
+    latency_count = sum(window['latency_histogram'])
+    p50_latency, p95_latency, p99_latency = (
+        min(histogram_percentile(window['latency_histogram'], pct), window['latency_max']) for pct in (50, 95, 99)
+    )
+    elapsed_hours = (window_end - run_start) / 3600
+
+    update_trend(trends['p99_latency'], elapsed_hours, p99_latency)
+    if window['max_memory_used']:
+        update_trend(trends['max_memory_used'], elapsed_hours, window['max_memory_used'])
+
+    p99_slope, p99_t_statistic = trend_fit(trends['p99_latency'])
+    memory_slope, memory_t_statistic = trend_fit(trends['max_memory_used'])
+
+    return {
+        'window_start': datetime.fromtimestamp(window['window_start'], timezone.utc).isoformat(),
+        'window_end': datetime.fromtimestamp(window_end, timezone.utc).isoformat(),
+        'invocations': window['invocations'],
+        'errors': window['errors'],
+        'throughput_rps': window['invocations'] / max(window_end - window['window_start'], 1e-9),
+        'avg_latency_ms': window['latency_sum'] / latency_count if latency_count else 0,
+        'p50_latency_ms': p50_latency,
+        'p95_latency_ms': p95_latency,
+        'p99_latency_ms': p99_latency,
+        'max_latency_ms': window['latency_max'],
+        'avg_billed_duration_ms': window['billed_sum'] / window['billed_count'] if window['billed_count'] else 0,
+        'max_memory_used_mb': window['max_memory_used'],
+        'p99_latency_trend_ms_per_hour': p99_slope,
+        'max_memory_trend_mb_per_hour': memory_slope,
+        'p99_latency_growth': relative_growth(trends['p99_latency'], p99_slope),
+        'max_memory_growth': relative_growth(trends['max_memory_used'], memory_slope),
+        'p99_latency_drift': is_drifting(trends['p99_latency'], p99_slope, p99_t_statistic),
+        'max_memory_drift': is_drifting(trends['max_memory_used'], memory_slope, memory_t_statistic),
+    }
+
+
+def soak_in_parallel(invoke_fn, concurrent_users, duration, window_seconds, output_file):
+    # invoke_fn(i) must return (status_code, latency_ms, billed_duration_ms, max_memory_used_mb).
+    # Only the current window and the running trend sums are kept; every closed window is appended to output_file.
+    start_time = time.time()
+    window = new_window_stats(start_time)
+    trends = {'p99_latency': new_trend(), 'max_memory_used': new_trend()}
+    total_requests = 0
+    windows_written = 0
+
+    with open(output_file, 'a') as f, concurrent.futures.ThreadPoolExecutor(max_workers=concurrent_users) as executor:
+        while True:
+            now = time.time()
+            if now - window['window_start'] >= window_seconds or now - start_time >= duration:
+                window_record = close_window(window, now, start_time, trends)
+                f.write(json.dumps(window_record) + '\n')
+                f.flush()
+                windows_written += 1
+
+                print(f"[INFO] Window {windows_written}: {window_record['invocations']} invocations, "
+                      f"p99={window_record['p99_latency_ms']:.2f} ms, max memory={window_record['max_memory_used_mb']} MB")
+                if window_record['p99_latency_drift']:
+                    print(f"[WARN] p99 latency has grown {window_record['p99_latency_growth']:.1%} over the run "
+                          f"({window_record['p99_latency_trend_ms_per_hour']:.2f} ms/hour)")
+                if window_record['max_memory_drift']:
+                    print(f"[WARN] Max memory used has grown {window_record['max_memory_growth']:.1%} over the run "
+                          f"({window_record['max_memory_trend_mb_per_hour']:.2f} MB/hour)")
+
+                if now - start_time >= duration:
+                    break
+                window = new_window_stats(now)
+
+            futures = [executor.submit(invoke_fn, total_requests + i) for i in range(concurrent_users)]
+            total_requests += concurrent_users
+            for future in concurrent.futures.as_completed(futures):
+                record_invocation(window, *future.result())
+
+    end_time = time.time()
+    print(f"[INFO] Total requests sent: {total_requests}")
+    print(f"[INFO] {windows_written} rolling windows appended to {output_file}")
+    return total_requests, start_time, end_time
@@ -0,0 +1,115 @@
+import concurrent.futures
+import threading
+import time
+import boto3
+from botocore.awsrequest import AWSHTTPConnectionPool, AWSHTTPSConnectionPool
+from botocore.config import Config
+
+# botocore defaults to 10 pooled connections; the pool is sized to the target concurrency instead
+DEFAULT_POOL_CONNECTIONS = 10
+CONNECT_TIMEOUT = 5
+# Synchronous invocations can run for up to 15 minutes
+READ_TIMEOUT = 900
+RETRY_MODE = 'standard'
+DEFAULT_MAX_ATTEMPTS = 3
+
+
+def new_pool_stats():
+    return {
+        'lock': threading.Lock(),
+        'checkouts': 0,
+        'wait_total_ms': 0.0,
+        'wait_max_ms': 0.0,
+        'connections_opened': 0,
+    }
+
+
+def reset_pool_stats(pool_stats):
+    with pool_stats['lock']:
+        pool_stats['checkouts'] = 0
+        pool_stats['wait_total_ms'] = 0.0
+        pool_stats['wait_max_ms'] = 0.0
+        pool_stats['connections_opened'] = 0
+
+
+def timed_pool_class(base_class, pool_stats):
+    class TimedConnectionPool(base_class):
+        def _get_conn(self, timeout=None):
+            wait_start = time.perf_counter()
+            try:
+                return super()._get_conn(timeout)
+            finally:
+                wait_ms = (time.perf_counter() - wait_start) * 1000
+                with pool_stats['lock']:
+                    pool_stats['checkouts'] += 1
+                    pool_stats['wait_total_ms'] += wait_ms
+                    pool_stats['wait_max_ms'] = max(pool_stats['wait_max_ms'], wait_ms)
+
+        def _new_conn(self):
+            with pool_stats['lock']:
+                pool_stats['connections_opened'] += 1
+            return super()._new_conn()
+
+    return TimedConnectionPool
+
+
+def instrument_pool_wait(client, pool_stats):
+    # botocore keeps its urllib3 PoolManager private; pools are created lazily, so swapping the classes before
+    # the first request is enough to time every connection checkout
+    http_session = getattr(getattr(client, '_endpoint', None), 'http_session', None)
+    manager = getattr(http_session, '_manager', None)
+    if manager is None:
+        print(f"[WARN] Unable to instrument the connection pool of the {client.meta.service_model.service_name} client")
+        return
+    manager.pool_classes_by_scheme = {
+        'http': timed_pool_class(AWSHTTPConnectionPool, pool_stats),
+        'https': timed_pool_class(AWSHTTPSConnectionPool, pool_stats),
+    }
+
+
+def create_client(service_name, concurrency=1, region_name=None, max_attempts=DEFAULT_MAX_ATTEMPTS):
+    config = Config(
+        max_pool_connections=max(concurrency, DEFAULT_POOL_CONNECTIONS),
+        connect_timeout=CONNECT_TIMEOUT,
+        read_timeout=READ_TIMEOUT,
+        tcp_keepalive=True,
+        retries={'mode': RETRY_MODE, 'total_max_attempts': max_attempts},
+    )
+    client = boto3.client(service_name, region_name=region_name, config=config)
+    pool_stats = new_pool_stats()
+    instrument_pool_wait(client, pool_stats)
+    return client, pool_stats
+
+
+def prewarm_connections(warm_call, connections, pool_stats):
+    # Issue `connections` concurrent calls so the TLS handshakes happen before the measurement window.
+    # The calls only need to reach the endpoint; errors such as AccessDenied still leave a warm connection.
+    barrier = threading.Barrier(connections)
+
+    def warm():
+        try:
+            barrier.wait(timeout=CONNECT_TIMEOUT)
+        except threading.BrokenBarrierError:
+            pass
+        try:
+            warm_call()
+        except Exception:
+            pass
+
+    warm_start = time.time()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=connections) as executor:
+        for future in [executor.submit(warm) for _ in range(connections)]:
+            future.result()
+
+    print(f"[INFO] Pre-warmed {pool_stats['connections_opened']} connections in {time.time() - warm_start:.2f} seconds")
+    reset_pool_stats(pool_stats)
+
+
+def print_pool_stats(pool_stats):
+    with pool_stats['lock']:
+        checkouts = pool_stats['checkouts']
+        average_wait = pool_stats['wait_total_ms'] / checkouts if checkouts else 0
+        print(f"[INFO] Connection pool checkouts: {checkouts}")
+        print(f"[INFO] Average pool wait (ms): {average_wait:.4f}")
+        print(f"[INFO] Maximum pool wait (ms): {pool_stats['wait_max_ms']:.4f}")
+        print(f"[INFO] New connections opened: {pool_stats['connections_opened']}")